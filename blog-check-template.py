@@ -4,15 +4,16 @@ blog_check.py — DNS Propagation & Connectivity Audit + Self‑Test (v4.4 — 2
 
 USAGE:
     chmod +x blog_check.py
-    ./blog_check.py [--advanced] [--debug]
+    ./blog_check.py [--advanced] [--debug] [--concurrency N]
 
 OPTIONS:
-    --advanced     Run traceroute (4 hops) & subdomain enumeration (subfinder)
-    --debug        Dump raw dig +trace output and full HTTP headers for troubleshooting
+    --advanced       Run traceroute (4 hops) & subdomain enumeration (subfinder)
+    --debug          Dump raw dig +trace output and full HTTP headers for troubleshooting
+    --concurrency N  Max DNS queries in flight at once (default 16)
 
 DESCRIPTION:
  1️⃣ Self‑Test Connectivity
-     • DNS resolution, ping, and HTTPS reachability to www.google.com  
+     • DNS resolution, TCP connect, and HTTPS reachability to www.google.com (probed concurrently)  
      • Rationale: Verify network/DNS is functional before auditing your domain
 
  2️⃣ Nameserver Sanity
@@ -23,6 +24,8 @@ DESCRIPTION:
  3️⃣ DNS Audit & Propagation
      • Validate expected CNAME/A targets (www, blogspot, Search Console)  
      • Compare resolution across local resolver, three public resolvers, and authoritative NS  
+     • All lookups go through dnspython, sent for every host as one concurrent batch  
+     • Expected answer is taken from whichever resolver replies first; each query is capped at an adaptive timeout (2 s to start)  
      • Reports propagation counts; warns on partial propagation
 
  4️⃣ Verification CNAME Handling
@@ -55,8 +58,9 @@ DESCRIPTION:
  9️⃣ (--debug) Raw DNS trace & HTTP header dump for deep troubleshooting
 
 DEPENDENCIES:
-    Required: dig, curl, ping  
+    Required: dnspython, requests  
     Optional (--advanced): traceroute, subfinder  
+    Optional (--debug): dig  
     Alternative (--advanced + --debug): traceroute, subfinder, shellcheck
 
 EXIT CODES:
@@ -64,9 +68,12 @@ EXIT CODES:
     >0 = critical failure (missing required config)
 """
 
-import argparse, subprocess, sys, shutil, re
-from typing import List
+import argparse, asyncio, subprocess, sys, shutil, re, socket, time
+from typing import Dict, List, Optional, Tuple
 from colorama import init, Fore, Style
+import dns.asyncresolver, dns.exception, dns.resolver
+import requests
+from requests.adapters import HTTPAdapter
 
 init(autoreset=True)
 
@@ -84,14 +91,33 @@ CUSTOM_DOMAIN="example.com"
 # DEFAULT NAMESERVER VARIABLES
 #############################################
 RESOLVERS = ["8.8.8.8", "1.1.1.1", "9.9.9.9"]
+QUERY_TIMEOUT = 2.0
+SELF_TEST_BUDGET = 2.0
+NEGATIVE_TTL = 60
 VERSION = "4.4"
 TEST_HOST = "www.google.com"
 
-BLOGGER_IPS = ["216.239.32.21","216.239.34.21","216.239.36.21","216.239.38.21"]
-FORWARD_IPS = ["198.49.23.144","198.49.23.145","198.185.159.144","198.185.159.145"]
+BLOGGER_IPS = frozenset({"216.239.32.21","216.239.34.21","216.239.36.21","216.239.38.21"})
+FORWARD_IPS = frozenset({"198.49.23.144","198.49.23.145","198.185.159.144","198.185.159.145"})
+
+# external binaries, looked up on PATH once at startup
+BIN = {name: shutil.which(name) for name in ('dig','traceroute','subfinder')}
+
+# keep-alive pool: repeat requests to a host skip the TCP + TLS handshake
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 exit_code = 0
-last_headers: List[str] = []
+last_response: Optional[requests.Response] = None
+_resolvers: Dict[Optional[str], dns.asyncresolver.Resolver] = {}
+_rtt: Dict[Optional[str], float] = {}
+_dns_cache: Dict[Tuple[str, str, Optional[str]], Tuple[List[str], float]] = {}
+_inflight: Dict[Tuple[str, str, Optional[str]], asyncio.Future] = {}
+use_dns_cache = True
+dns_concurrency = 16
+_dns_sem: Optional[asyncio.Semaphore] = None
+# NS hosted under the audited domain itself (answers are fully qualified, trailing dot)
+_GLUE_NS_RE = re.compile(r'(?:^|\.)' + re.escape(CUSTOM_DOMAIN) + r'\.?$', re.IGNORECASE)
 
 def print_status(ok, msg):
     sym, col = ("✓", Fore.GREEN) if ok else ("✗", Fore.RED)
@@ -101,130 +127,278 @@ def print_status(ok, msg):
 def print_warning(msg):
     print(f"{Fore.YELLOW}⚠ {msg}{Style.RESET_ALL}")
 
-def run(cmd):
-    try: return subprocess.check_output(cmd, stderr=subprocess.DEVNULL, text=True).strip()
-    except: return ""
-
-def dig(name, rtype='A', resolver=None):
-    args=['dig','+short','-t',rtype,name]
-    if resolver: args.append(f"@{resolver}")
-    return run(args).splitlines()
-
-def ping(ip):
-    return subprocess.call(['ping','-c1','-W1',ip], stdout=subprocess.DEVNULL)==0
-
-def curl_status(url):
-    return run(['curl','-s','-o','/dev/null','-w','%{http_code}',url])
-
-def curl_headers(url):
-    return run(['curl','-sI','--max-time','5',url]).splitlines()
-
-def self_test():
+def query_timeout(resolver=None):
+    # adaptive per-resolver timeout: 5× the smoothed response time, clamped to 0.25–5 s.
+    # Recursive resolvers (system + public) answer cached names in a few ms but cold ones need
+    # recursion, so their fast hits must not shrink the timeout below QUERY_TIMEOUT; only the
+    # authoritative NS, which answer without recursion, get the adaptive floor.
+    avg = _rtt.get(resolver)
+    floor = QUERY_TIMEOUT if resolver is None or resolver in RESOLVERS else 0.25
+    return QUERY_TIMEOUT if avg is None else max(floor, min(5.0, 5*avg))
+
+def record_rtt(resolver, elapsed):
+    _rtt[resolver] = elapsed if resolver not in _rtt else 0.7*_rtt[resolver] + 0.3*elapsed
+
+def cache_get(key):
+    hit = _dns_cache.get(key)
+    return list(hit[0]) if hit and hit[1] > time.monotonic() else None
+
+def cache_put(key, answers, ttl):
+    # answers keyed by (name, rtype, resolver), kept for the record's TTL
+    if use_dns_cache: _dns_cache[key] = (answers, time.monotonic() + ttl)
+
+def get_resolver(server=None):
+    # one resolver per nameserver (None = system resolver), reused for every query
+    if server not in _resolvers:
+        r = dns.asyncresolver.Resolver(configure=server is None)
+        if server: r.nameservers = [server]
+        _resolvers[server] = r
+    return _resolvers[server]
+
+def query_slots():
+    # caps queries in flight so the fan-out doesn't flood a small set of authoritative NS;
+    # created on first use so it belongs to the running event loop
+    global _dns_sem
+    if _dns_sem is None: _dns_sem = asyncio.Semaphore(dns_concurrency)
+    return _dns_sem
+
+async def _query(name, rtype, resolver):
+    async with query_slots():
+        # timed inside the slot: the timeout bounds the query, not the wait for a slot
+        start = time.monotonic()
+        try:
+            answer = await asyncio.wait_for(get_resolver(resolver).resolve(name, rtype), query_timeout(resolver))
+            answers, ttl = [r.to_text() for r in answer], answer.rrset.ttl
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer): answers, ttl = [], NEGATIVE_TTL
+        except (dns.exception.Timeout, asyncio.TimeoutError): answers, ttl = None, None
+        except (dns.exception.DNSException, OSError): return []   # local failure — not a response time
+        record_rtt(resolver, time.monotonic() - start)
+    if ttl is not None: cache_put((name, rtype, resolver), answers, ttl)
+    return answers
+
+async def adig(name, rtype='A', resolver=None):
+    # list of rdata ([] = no such record), or None if the query timed out
+    key = (name.lower(), rtype, resolver)
+    hit = cache_get(key)
+    if hit is not None: return hit
+    if key not in _inflight:
+        # concurrent callers asking the same question share one query
+        task = _inflight[key] = asyncio.ensure_future(_query(*key))
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # shielded: a cancelled caller (see replicated_lookup) must not cancel the shared query
+    answers = await asyncio.shield(_inflight[key])
+    return None if answers is None else list(answers)
+
+async def replicated_lookup(name, rtype='A', resolvers=(None, *RESOLVERS)):
+    # same query to every resolver at once; first non-empty answer wins, the rest stop being awaited
+    pending = {asyncio.ensure_future(adig(name, rtype, r)) for r in resolvers}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            answer = next(filter(None, (t.result() for t in done)), None)
+            if answer: return answer
+        return []
+    finally:
+        for t in pending: t.cancel()
+
+def tcp_probe(host, port=443, timeout=1.0):
+    # liveness via a TCP connect: no fork, and no raw-socket privilege as ICMP ping needs
+    try:
+        with socket.create_connection((host, port), timeout=timeout): return True
+    except OSError: return False
+
+def http_head(url, timeout=5):
+    try: return SESSION.head(url, allow_redirects=False, timeout=timeout)
+    except requests.RequestException: return None
+
+def http_status(url, timeout=5):
+    resp = http_head(url, timeout)
+    return str(resp.status_code) if resp is not None else ''
+
+def format_headers(resp):
+    # curl -sI layout; only rendered for the --debug dump
+    v = resp.raw.version
+    return "\n".join([f'HTTP/{v//10}.{v%10} {resp.status_code} {resp.reason}', *(f'{k}: {val}' for k, val in resp.headers.items())])
+
+async def http_probes(urls):
+    # independent HEAD requests — issue them together; the session's pool is thread-safe for this
+    return dict(zip(urls, await asyncio.gather(*(asyncio.to_thread(http_head, url) for url in urls))))
+
+async def self_test():
     global exit_code
     print(f"\n===== blog-check.py v{VERSION} — Self‑Test =====")
-    if not shutil.which('dig'):
-        exit_code |= print_status(False, 'dig missing')
-        sys.exit(exit_code)
-
-    ip = dig(TEST_HOST)[0] if dig(TEST_HOST) else ''
+    # the three probes don't depend on each other (the TCP probe resolves TEST_HOST itself) — run them
+    # together within one budget; a probe still running when it runs out counts as failed
+    probes = [asyncio.ensure_future(adig(TEST_HOST)),
+              asyncio.ensure_future(asyncio.to_thread(tcp_probe, TEST_HOST)),
+              asyncio.ensure_future(asyncio.to_thread(http_status, f'https://{TEST_HOST}', SELF_TEST_BUDGET))]
+    await asyncio.wait(probes, timeout=SELF_TEST_BUDGET)
+    for t in probes: t.cancel()
+    ips, alive, status = (t.result() if t.done() and not t.cancelled() else None for t in probes)
+    ip = ips[0] if ips else ''
+    if status is None: status = 'timed out'
     exit_code |= print_status(bool(ip), f'DNS resolves {TEST_HOST} → {ip}')
-    if not ip or not ping(ip):
-        exit_code |= print_status(False, 'ping failed')
-        sys.exit(exit_code)
+    if not ip or not alive:
+        exit_code |= print_status(False, 'TCP connect failed')
+        return False
 
-    print_status(True, 'ping OK')
-    status = curl_status(f'https://{TEST_HOST}')
+    print_status(True, 'TCP connect OK')
     if status != '200':
         exit_code |= print_status(False, f'HTTPS status {status}')
-        sys.exit(exit_code)
+        return False
 
     print_status(True, 'HTTPS OK')
     # match shell’s “✔ Self‑tests passed”
     print(f"{Fore.GREEN}✔ Self‑tests passed{Style.RESET_ALL}")
+    return True
 
-def nameserver_sanity():
+def nameserver_sanity(ns):
     print("\n===== Nameserver Sanity =====")
-    ns = dig(CUSTOM_DOMAIN, 'NS')
-    glue = any(re.search(fr"{re.escape(CUSTOM_DOMAIN)}$", n) for n in ns)
+    if ns is None:
+        print_warning(f'NS lookup for {CUSTOM_DOMAIN} timed out'); return []
+    glue = any(_GLUE_NS_RE.search(n) for n in ns)
     if glue: print_warning(f'Glue-style NS detected: {ns}')
     else: print_status(True, 'Nameservers correct')
     return ns
 
-def dns_audit(ns_list):
+async def dns_audit(ns_list):
     global exit_code
     print("\n===== DNS Audit =====")
-    for host, expected in [( "www", WWW_TARGET ),( BLOG_SUBDOMAIN, BLOGSPOT_DOMAIN ),( CNAME_1_HOST, CNAME_1_TARGET )]:
-        fqdn = f"{host}.{CUSTOM_DOMAIN}"
+    hosts = [( "www", WWW_TARGET ),( BLOG_SUBDOMAIN, BLOGSPOT_DOMAIN ),( CNAME_1_HOST, CNAME_1_TARGET )]
+    fqdns = [f"{host}.{CUSTOM_DOMAIN}" for host, _ in hosts]
+    # every host's lookups go out as one batch (bounded by query_slots) and are reported host by host;
+    # the public ones don't need the NS addresses, so they start before those are resolved
+    refs = [asyncio.ensure_future(replicated_lookup(fqdn, 'CNAME')) for fqdn in fqdns]
+    public = [[asyncio.ensure_future(adig(fqdn, 'CNAME', r)) for r in RESOLVERS] for fqdn in fqdns]
+    verify_a = asyncio.ensure_future(adig(f"{CNAME_1_HOST}.{CUSTOM_DOMAIN}", 'A'))
+    # dnspython needs addresses, not names, for the authoritative NS
+    ns_ips = []
+    for ns, addrs in zip(ns_list, await asyncio.gather(*(adig(ns) for ns in ns_list))):
+        if addrs: ns_ips.append(addrs[0])
+        else: print_warning(f'Authoritative NS {ns} — address lookup {"timed out" if addrs is None else "returned nothing"}')
+    auth = [[asyncio.ensure_future(adig(fqdn, 'CNAME', ns)) for ns in ns_ips] for fqdn in fqdns]
+    for (host, expected), fqdn, ref, pub_tasks, auth_tasks in zip(hosts, fqdns, refs, public, auth):
         print(f"\n── {fqdn} ──")
-        cname = dig(fqdn, 'CNAME')
+        cname = await ref
         if not cname:
+            # nothing resolved it: propagation can't be counted, so don't wait on stragglers
+            for t in pub_tasks + auth_tasks + ([verify_a] if host == CNAME_1_HOST else []): t.cancel()
             exit_code |= print_status(False, f'Missing CNAME — expected {host}→{expected}')
             continue
         print(f'CNAME → {cname[0]}')
         if host == CNAME_1_HOST:
-            a = dig(fqdn, 'A')
-            if a: print_warning('Verification CNAME resolves to A-record — NXDOMAIN expected')
+            a = await verify_a
+            if a is None: print_warning('Verification CNAME A lookup timed out — NXDOMAIN not confirmed')
+            elif a: print_warning('Verification CNAME resolves to A-record — NXDOMAIN expected')
             else: print_status(True, 'Verification CNAME NXDOMAIN on A lookup')
-        pub = sum((dig(fqdn,'CNAME',r) or [''])[0]==cname[0] for r in RESOLVERS)
-        auth = sum((dig(fqdn,'CNAME',ns) or [''])[0]==cname[0] for ns in ns_list)
-        print(f'Propagation → public {pub}/{len(RESOLVERS)} | authoritative {auth}/{len(ns_list)}')
-
-def root_a_record_check():
+        pub_answers = await asyncio.gather(*pub_tasks)
+        auth_answers = await asyncio.gather(*auth_tasks)
+        pub = sum((ans or [''])[0]==cname[0] for ans in pub_answers)
+        auth_ok = sum((ans or [''])[0]==cname[0] for ans in auth_answers)
+        timed_out = sum(ans is None for ans in pub_answers + auth_answers)
+        print(f'Propagation → public {pub}/{len(RESOLVERS)} | authoritative {auth_ok}/{len(ns_list)}'
+              + (f' ({timed_out} timed out)' if timed_out else ''))
+
+def root_a_record_check(root_ips):
     global exit_code
     print("\n===== Root A-record Presence & Forwarding =====")
-    root_ips = dig(CUSTOM_DOMAIN)
-    if all(ip in root_ips for ip in BLOGGER_IPS):
+    if root_ips is None:
+        exit_code |= print_status(False, f'A-record lookup for {CUSTOM_DOMAIN} timed out')
+        return 'invalid'
+    root_set = frozenset(root_ips)
+    if BLOGGER_IPS <= root_set:
         print_status(True, 'All Blogger A-records present'); return 'blogger'
-    if all(ip in root_ips for ip in FORWARD_IPS):
+    if FORWARD_IPS <= root_set:
         print_warning('Registrar DNS‑forwarding detected — recommend switching to Blogger A‑records')
         print_status(True, 'Registrar DNS‑forwarding — redirect handled externally')
         return 'registrar'
     exit_code |= print_status(False, f'A-record misconfigured — found {root_ips}')
     return 'invalid'
 
-def redirect_check(mode: str):
-    global last_headers, exit_code
+def redirect_check(mode: str, probes):
+    global last_response, exit_code
     if mode == 'blogger':
-        last_headers = curl_headers(f'https://{CUSTOM_DOMAIN}')
-        status = last_headers[0].split()[1] if last_headers else ''
-        location = next((l.split()[1] for l in last_headers if l.startswith('Location:')), '')
+        resp = last_response = probes[f'https://{CUSTOM_DOMAIN}']
         exit_code |= print_status(
-            status == '301' and location == f'https://www.{CUSTOM_DOMAIN}/',
+            resp is not None and resp.status_code == 301 and resp.headers.get('Location') == f'https://www.{CUSTOM_DOMAIN}/',
             'HTTP 301 → www'
         )
 
-def https_status():
+def https_status(probes):
     global exit_code
     print("\n===== Blogger HTTPS Status =====")
-    exit_code |= print_status(curl_status(f'https://www.{CUSTOM_DOMAIN}')=='200','HTTPS enabled')
-    exit_code |= print_status(curl_status(f'http://www.{CUSTOM_DOMAIN}')=='301','HTTP→HTTPS redirect enabled')
-
-def advanced_diagnostics():
-    if shutil.which('traceroute'):
-        print("\n===== ADVANCED: Traceroute ====="); subprocess.call(['traceroute','-m4',CUSTOM_DOMAIN])
-    if shutil.which('subfinder'):
-        print("\n===== ADVANCED: Subdomain Enumeration ====="); subprocess.call(['subfinder','-silent','-d',CUSTOM_DOMAIN])
+    https, http = probes[f'https://www.{CUSTOM_DOMAIN}'], probes[f'http://www.{CUSTOM_DOMAIN}']
+    exit_code |= print_status(https is not None and https.status_code == 200,'HTTPS enabled')
+    exit_code |= print_status(http is not None and http.status_code == 301,'HTTP→HTTPS redirect enabled')
+
+async def capture(cmd):
+    # run to completion with output buffered, so tools running side by side don't interleave
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    out, err = await proc.communicate()
+    return out.decode(errors='replace'), err.decode(errors='replace')
+
+async def advanced_diagnostics():
+    jobs = {}
+    if BIN['traceroute']: jobs['Traceroute'] = [BIN['traceroute'],'-m4',CUSTOM_DOMAIN]
+    if BIN['subfinder']: jobs['Subdomain Enumeration'] = [BIN['subfinder'],'-silent','-d',CUSTOM_DOMAIN]
+    results = await asyncio.gather(*(capture(cmd) for cmd in jobs.values()))
+    for title, (out, err) in zip(jobs, results):
+        print(f"\n===== ADVANCED: {title} =====")
+        print(out, end='', flush=True); print(err, end='', file=sys.stderr, flush=True)
 
 def debug_info():
     print("\n===== DEBUG =====")
-    subprocess.call(['dig','+trace',CUSTOM_DOMAIN])
-    if last_headers: print("\n".join(last_headers))
-
-def main():
+    if BIN['dig']: subprocess.call([BIN['dig'],'+trace',CUSTOM_DOMAIN])
+    else: print_warning('dig not installed — skipping raw DNS trace')
+    if last_response is not None: print(format_headers(last_response))
+
+async def drain_queries(*tasks):
+    # cancel and await leftover lookups before the loop shuts down, so a resolver error that
+    # lands late is absorbed by _query instead of being reported by asyncio.run()'s teardown
+    pending = [*tasks, *_inflight.values()]
+    for t in pending: t.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+def positive_int(value):
+    n = int(value)
+    if n < 1: raise argparse.ArgumentTypeError(f'must be a positive integer, got {value}')
+    return n
+
+async def main():
+    global use_dns_cache, dns_concurrency
     parser = argparse.ArgumentParser()
     parser.add_argument('--advanced', action='store_true')
     parser.add_argument('--debug', action='store_true')
+    parser.add_argument('--concurrency', type=positive_int, default=16, metavar='N')
     args = parser.parse_args()
-
-    self_test()
-    ns_list = nameserver_sanity()
-    dns_audit(ns_list)
-    mode = root_a_record_check()
-    redirect_check(mode)
-    https_status()
-    if args.advanced: advanced_diagnostics()
+    use_dns_cache = not args.debug   # --debug always asks the network
+    dns_concurrency = args.concurrency
+
+    # fetches that don't depend on each other start together; each is awaited where its
+    # output is first needed, so the report still prints stage by stage
+    self_test_task = asyncio.create_task(self_test())
+    ns_task = asyncio.create_task(adig(CUSTOM_DOMAIN, 'NS'))
+    root_a_task = asyncio.create_task(adig(CUSTOM_DOMAIN))
+
+    if not await self_test_task:
+        await drain_queries(ns_task, root_a_task)
+        return exit_code
+    # HTTP probes run in worker threads, which can't be cancelled: only start them once the
+    # self-test has passed, so a failing run isn't held up waiting on them at exit
+    urls = [f'https://www.{CUSTOM_DOMAIN}', f'http://www.{CUSTOM_DOMAIN}', f'https://{CUSTOM_DOMAIN}']
+    http_task = asyncio.create_task(http_probes(urls))
+    ns_list = nameserver_sanity(await ns_task)
+    await dns_audit(ns_list)
+    mode = root_a_record_check(await root_a_task)
+    # DNS results are all consumed; queries left behind by a missing CNAME are only
+    # stragglers now (dns_audit cancelled their callers, not the shielded queries)
+    await drain_queries()
+    probes = await http_task
+    redirect_check(mode, probes)
+    https_status(probes)
+    if args.advanced: await advanced_diagnostics()
     if args.debug: debug_info()
-    sys.exit(exit_code)
+    return exit_code
 
 if __name__=='__main__':
-    main()
\ No newline at end of file
+    sys.exit(asyncio.run(main()))